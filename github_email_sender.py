@@ -4,40 +4,296 @@ GitHub Actions version - Monthly Email Sender for YouTube Family Plan
 Simplified version that runs once per execution (no continuous scheduling needed)
 """
 
+import asyncio
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email import policy
+from email.message import EmailMessage
+from email.utils import formataddr
+import functools
+import html
 import os
+import socket
+import ssl
+import string
+import sys
+import threading
 import logging
+from types import SimpleNamespace
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+import smtp_pool
+
+try:
+    import aiosmtplib
+except ImportError:  # Only needed for SMTP_ASYNC
+    aiosmtplib = None
+
+logger = logging.getLogger(__name__)
+
+def configure_logging():
+    """Configure logging for the command-line entry points (importers keep their own setup)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+# Seconds to wait on any single SMTP socket operation. Without it a
+# connection silently dropped by a NAT blocks in getreply() until TCP
+# retransmission gives up, which takes minutes.
+_SMTP_TIMEOUT = 30
+
+# Built once: loading the CA bundle is the expensive part of a TLS context.
+# An SSLContext can be shared between threads and connections.
+_SSL_CONTEXT = ssl.create_default_context()
+
+class _ResumingTLSContext:
+    """Stands in for _SSL_CONTEXT so a new connection offers a previous TLS session
+    
+    smtplib only calls context.wrap_socket(sock, server_hostname=...), with no
+    way to pass a session; resuming one skips the full TLS key exchange.
+    """
+    
+    def __init__(self, session):
+        self.session = session
+    
+    def wrap_socket(self, sock, server_hostname=None):
+        return _SSL_CONTEXT.wrap_socket(sock, server_hostname=server_hostname, session=self.session)
+
+_SUBJECT_TEMPLATE = "YouTube Family Plan - Monthly Payment Due ({date})"
+
+# HTML version with proper formatting, parsed once at import
+_HTML_TEMPLATE = string.Template("""
+<html>
+<body style="font-family: Arial, sans-serif;">
+    <p>Hello,</p>
+    
+    <p>This is your monthly reminder for the YouTube Family Plan payment due on the 20th of ${date}.</p>
+    
+    <div style="background-color: #f5f5f5; padding: 15px; border-radius: 5px; font-family: monospace;">
+        <pre style="margin: 0; font-family: monospace; white-space: pre-wrap;">${breakdown}</pre>
+    </div>
+    
+    <p><strong>After sending payment, kindly send a screenshot via reply to this email or through messenger as confirmation.</strong></p>
+    
+    <p>Thank you!</p>
+    
+    <p>Best regards,<br>
+    Dabs</p>
+</body>
+</html>""")
+
+@functools.lru_cache(maxsize=1)
+def _load_config():
+    """Read the sender settings from the environment once per process
+    
+    Call _load_config.cache_clear() after changing the environment.
+    """
+    def _env_flag(name):
+        """True when the variable is set to "true" or "1" (any case)"""
+        return os.getenv(name, 'false').strip().lower() in ('1', 'true')
+    
+    return SimpleNamespace(
+        smtp_server=os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+        # Port 465 uses implicit TLS; any other port (e.g. 587) upgrades with STARTTLS
+        smtp_port=int(os.getenv('SMTP_PORT') or smtplib.SMTP_SSL_PORT),
+        sender_email=os.getenv('SENDER_EMAIL'),
+        sender_password=os.getenv('SENDER_PASSWORD'),
+        # Send one separately addressed message per recipient instead of a
+        # single message to the whole list
+        personalized=_env_flag('PERSONALIZED_EMAILS'),
+        # Upper bound on concurrent SMTP connections for personalized sends
+        max_connections=max(1, int(os.getenv('SMTP_MAX_CONNECTIONS') or '4')),
+        # Use asyncio connections instead of threads for personalized sends
+        use_async=_env_flag('SMTP_ASYNC'),
+        # Optional text file overriding the built-in breakdown
+        breakdown_file=os.getenv('BREAKDOWN_FILE'),
+        # Log what would be sent without building or sending any email
+        dry_run=_env_flag('DRY_RUN'),
+        # Print the SMTP conversation to stderr (off by default: one write per line)
+        smtp_debug=_env_flag('SMTP_DEBUG')
+    )
+
+class SMTPSession:
+    """A pooled SMTP connection that is replaced once if the server drops it"""
+    
+    def __init__(self, pool):
+        self._pool = pool
+        self._server = pool.acquire()
+        self._reconnected = False
+        self._fresh = True
+    
+    def send(self, data, from_addr, to_addrs):
+        """Send a serialized message, returning the dict of refused recipients"""
+        self._ensure_alive()
+        try:
+            return self._send(data, from_addr, to_addrs)
+        except smtplib.SMTPServerDisconnected:
+            if self._reconnected:
+                raise
+            # The server dropped the session mid-transaction
+            self._reconnect()
+            return self._send(data, from_addr, to_addrs)
+        finally:
+            self._fresh = False
+    
+    def _ensure_alive(self):
+        """Check with NOOP that a reused connection is still open, reconnecting once if not
+        
+        Servers drop idle sessions (e.g. "421 Timeout - closing connection"),
+        so a connection that has already sent mail is checked before reuse.
+        A connection that was just opened is not.
+        """
+        if self._fresh or self._reconnected:
+            return
+        try:
+            code, _ = self._server.noop()
+        except OSError:  # Includes SMTPServerDisconnected and socket timeouts
+            code = None
+        if code != 250:
+            self._reconnect()
+    
+    def _reconnect(self):
+        logger.warning("SMTP server disconnected, reconnecting")
+        self._pool.discard(self._server)
+        # Cleared first so close() doesn't discard it again if acquire() fails
+        self._server = None
+        self._reconnected = True
+        self._server = self._pool.acquire()
+        self._fresh = True
+    
+    def _send(self, data, from_addr, to_addrs):
+        if len(to_addrs) > 1 and self._server.has_extn('pipelining'):
+            return self._send_pipelined(data, from_addr, to_addrs)
+        return self._server.sendmail(from_addr, to_addrs, data)
+    
+    def _send_pipelined(self, data, from_addr, to_addrs):
+        """Send MAIL FROM and every RCPT TO in one write, then read the replies (RFC 2920)
+        
+        smtplib waits for each reply before sending the next command, so a
+        multi-recipient transaction costs one round trip per recipient.
+        """
+        server = self._server
+        
+        commands = [f"MAIL FROM:{smtplib.quoteaddr(from_addr)}"]
+        commands += [f"RCPT TO:{smtplib.quoteaddr(addr)}" for addr in to_addrs]
+        server.send("".join(f"{command}\r\n" for command in commands))
+        
+        # Every pipelined command gets a reply, even when MAIL FROM fails
+        mail_code, mail_resp = server.getreply()
+        refused = {}
+        for addr in to_addrs:
+            code, resp = server.getreply()
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        if mail_code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if len(refused) == len(to_addrs):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        
+        code, resp = server.data(data)
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+    
+    def close(self):
+        """Return the connection to the pool, or discard it if the server hung up"""
+        if self._server is None:
+            return
+        if self._server.sock is None:
+            self._pool.discard(self._server)
+        else:
+            self._pool.release(self._server)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+# YouTube Family Plan recipients
+_FAMILY_RECIPIENTS = [
+    'sophiaypa@gmail.com',         # Sophia Aguilar
+    'salongadaviid@gmail.com',     # David Salonga
+    'jagabriel031@gmail.com',      # Coach John
+    'rocalansingin@gmail.com'      # Rollen Calansingin
+]
 
 class GitHubEmailSender:
-    def __init__(self):
+    def __init__(self, recipients=None, subject=_SUBJECT_TEMPLATE, template=_HTML_TEMPLATE,
+                 reply_to_name="YouTube Family Plan Manager", breakdown_file=None):
+        """Create a sender; the defaults send the monthly reminder to the family
+        
+        template is a string.Template using ${date} and ${breakdown}; the
+        breakdown is substituted HTML-escaped.
+        breakdown_file overrides the BREAKDOWN_FILE setting.
+        """
         # Email configuration from environment variables (GitHub Secrets)
-        self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
-        self.sender_email = os.getenv('SENDER_EMAIL')
-        self.sender_password = os.getenv('SENDER_PASSWORD')
-        
-        # YouTube Family Plan recipients
-        self.recipients = [
-            'sophiaypa@gmail.com',         # Sophia Aguilar
-            'salongadaviid@gmail.com',     # David Salonga
-            'jagabriel031@gmail.com',      # Coach John
-            'rocalansingin@gmail.com'      # Rollen Calansingin
-        ]
+        config = _load_config()
+        self.smtp_server = config.smtp_server
+        self.smtp_port = config.smtp_port
+        self.sender_email = config.sender_email
+        self.sender_password = config.sender_password
+        
+        self.recipients = list(recipients if recipients is not None else _FAMILY_RECIPIENTS)
         
         # Email content
-        self.subject = "YouTube Family Plan - Monthly Payment Due ({date})"
+        self.subject = subject
+        self._template = template
+        self.reply_to_name = reply_to_name
+        # Left unset without SENDER_EMAIL, so messages can still be built to inspect
+        self._from_header = None
+        self._reply_to_header = None
+        if self.sender_email:
+            self._from_header = formataddr(("David Salonga", self.sender_email))
+            self._reply_to_header = formataddr((self.reply_to_name, self.sender_email))
+        
+        self.personalized = config.personalized
+        self.max_connections = config.max_connections
+        self.use_async = config.use_async
+        if self.use_async and aiosmtplib is None:
+            logger.warning("SMTP_ASYNC is set but aiosmtplib is not installed, using threads")
+            self.use_async = False
+        
+        self.breakdown_file = breakdown_file or config.breakdown_file
+        self.dry_run = config.dry_run
+        self.smtp_debug = config.smtp_debug
+        self._breakdown_cache = None  # (mtime_ns, content)
+        
+        self._breakdown = None
+        self._breakdown_html = None
+        self._current_date_str = None
+        self._subject_line = None
+        self._html_body = None
+        self._message_bytes = None
+        
+        self._smtp_addrs = None
+        self._tls_session = None
+        
+        self._failure_lock = threading.Lock()
+        self._failure_count = 0
+        self._abort = threading.Event()
+    
+    def read_breakdown_content(self):
+        """Read the breakdown from BREAKDOWN_FILE, re-reading only after the file changes"""
+        mtime_ns = os.stat(self.breakdown_file).st_mtime_ns
+        if self._breakdown_cache is None or self._breakdown_cache[0] != mtime_ns:
+            with open(self.breakdown_file, 'r', encoding='utf-8') as file:
+                self._breakdown_cache = (mtime_ns, file.read().strip())
+        return self._breakdown_cache[1]
     
     def get_breakdown_content(self):
-        """Get the formatted YouTube Family Plan breakdown"""
+        """Get the formatted YouTube Family Plan breakdown
+        
+        Raises OSError if breakdown_file is set but can't be read, rather
+        than falling back to the built-in amounts.
+        """
+        if self.breakdown_file:
+            return self.read_breakdown_content()
+        
         return """📋 Monthly Plan Details
 
 Total Monthly Cost: ₱379
@@ -62,92 +318,331 @@ This family plan keeps your cost lower at just ₱95 👍"""
     
     def create_email_message(self, recipient):
         """Create email message for a recipient"""
-        current_date = datetime.now().strftime("%B %Y")
-        breakdown_content = self.get_breakdown_content()
-        
-        message = MIMEMultipart()
-        from email.utils import formataddr
-        message["From"] = formataddr(("David Salonga", self.sender_email))
-        message["To"] = recipient
-        message["Subject"] = self.subject.format(date=current_date)
-        message["Reply-To"] = f"YouTube Family Plan Manager <{self.sender_email}>"
-        
-        # HTML version with proper formatting
-        html_body = f"""
-<html>
-<body style="font-family: Arial, sans-serif;">
-    <p>Hello,</p>
-    
-    <p>This is your monthly reminder for the YouTube Family Plan payment due on the 20th of {current_date}.</p>
+        return self._build_message(recipient)
     
-    <div style="background-color: #f5f5f5; padding: 15px; border-radius: 5px; font-family: monospace;">
-        <pre style="margin: 0; font-family: monospace; white-space: pre-wrap;">{breakdown_content}</pre>
-    </div>
+    def build_common_message(self):
+        """Create one message shared by all recipients (addressed via the SMTP envelope)"""
+        return self._build_message("undisclosed-recipients:;")
     
-    <p><strong>After sending payment, kindly send a screenshot via reply to this email or through messenger as confirmation.</strong></p>
+    def _prepare_batch(self):
+        """Render the date, subject and HTML body shared by every message in this run
+        
+        The rendering only depends on the month and the breakdown, so a
+        sender reused for several runs keeps what it already rendered
+        until either changes.
+        """
+        current_date_str = datetime.now().strftime("%B %Y")
+        breakdown = self.get_breakdown_content()
+        if (current_date_str == self._current_date_str and breakdown == self._breakdown
+                and self._message_bytes is not None):
+            return
+        
+        self._current_date_str = current_date_str
+        self._breakdown = breakdown
+        self._subject_line = self.subject.format(date=self._current_date_str)
+        
+        # Escaped so a "<" or "&" in the breakdown file shows up as text
+        self._breakdown_html = html.escape(self._breakdown, quote=False)
+        self._html_body = self._template.substitute(date=self._current_date_str, breakdown=self._breakdown_html)
+        
+        # Only the To header differs between recipients, so the rest of the
+        # message is flattened once and To is prepended per recipient
+        self._message_bytes = self._build_message(None).as_bytes(policy=policy.SMTP)
     
-    <p>Thank you!</p>
+    def _serialize_message(self, to_header):
+        """Serialized message for the given To header, without re-running the generator"""
+        if self._message_bytes is None:
+            self._prepare_batch()
+        return b"To: " + to_header.encode("ascii") + b"\r\n" + self._message_bytes
     
-    <p>Best regards,<br>
-    Dabs</p>
-</body>
-</html>"""
+    def _build_message(self, to_header):
+        """Build the reminder message with the given To header"""
+        if self._html_body is None:
+            self._prepare_batch()
         
-        message.attach(MIMEText(html_body, "html"))
+        # The HTML body is the only part, so no multipart wrapper is needed
+        message = EmailMessage()
+        if self._from_header is not None:
+            message["From"] = self._from_header
+        if to_header is not None:
+            message["To"] = to_header
+        message["Subject"] = self._subject_line
+        if self._reply_to_header is not None:
+            message["Reply-To"] = self._reply_to_header
+        message.set_content(self._html_body, subtype="html", charset="utf-8")
         
         return message
     
-    def send_email(self, recipient, message):
-        """Send email to a specific recipient"""
+    def _resolve_smtp_server(self):
+        """Resolve the SMTP server addresses once and reuse them for every connection"""
+        if self._smtp_addrs is None:
+            addrinfo = socket.getaddrinfo(self.smtp_server, self.smtp_port, type=socket.SOCK_STREAM)
+            # Keep getaddrinfo's preference order, minus duplicates
+            self._smtp_addrs = list(dict.fromkeys(sockaddr[0] for *_, sockaddr in addrinfo))
+        return self._smtp_addrs
+    
+    def _connect_any(self, server):
+        """Connect to the first resolved address that accepts, as socket.create_connection does
+        
+        A runner without IPv6 then still gets through when an AAAA
+        record sorts first.
+        """
+        error = None
+        for address in self._resolve_smtp_server():
+            try:
+                return server.connect(address, self.smtp_port)
+            except OSError as e:
+                logger.debug("Could not connect to %s (%s): %s", self.smtp_server, address, e)
+                server.close()
+                error = e
+        raise error
+    
+    def connect(self):
+        """Open an authenticated SMTP session"""
+        implicit_tls = self.smtp_port == smtplib.SMTP_SSL_PORT
+        context = _ResumingTLSContext(self._tls_session) if self._tls_session else _SSL_CONTEXT
+        if implicit_tls:
+            # TLS is negotiated as part of the connect, saving the
+            # STARTTLS exchange and the second EHLO
+            server = smtplib.SMTP_SSL(context=context, timeout=_SMTP_TIMEOUT)
+        else:
+            server = smtplib.SMTP(timeout=_SMTP_TIMEOUT)
+        if self.smtp_debug:
+            server.set_debuglevel(1)
+        # Connect to the cached addresses, but keep the real hostname so TLS
+        # SNI and certificate validation still target the SMTP server. This
+        # relies on smtplib internals: SMTP_SSL._get_socket() and starttls()
+        # pass server_hostname=self._host, which is only set from the host
+        # given to the constructor (connect() leaves it alone).
+        server._host = self.smtp_server
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(message)
-            
-            logging.info(f"Email sent successfully to {recipient}")
-            return True
+            code, msg = self._connect_any(server)
+            if code != 220:
+                raise smtplib.SMTPConnectError(code, msg)
+            # smtplib writes every command separately, so don't let Nagle hold
+            # them back waiting for an ACK; keepalive stops NATs from silently
+            # dropping pooled connections while they are idle
+            server.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            server.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if not implicit_tls:
+                server.starttls(context=context)
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        
+        # TLS 1.3 tickets arrive after the handshake, so the session is
+        # captured once the server has replied to AUTH
+        logger.debug("TLS session reused: %s", server.sock.session_reused)
+        self._tls_session = server.sock.session
+        return server
+    
+    def send_email(self, session, recipients, data):
+        """Send a serialized message to the given recipients over an open SMTP session
+        
+        Returns a dict of the recipients the server refused.
+        """
+        return session.send(data, from_addr=self.sender_email, to_addrs=recipients)
+    
+    def open_session(self):
+        """Open an SMTP session that can be reused for any number of sends
+        
+        Connections come from the process-wide pool for this server and
+        account, so later sessions reuse them instead of logging in again.
+        """
+        pool = smtp_pool.get_pool(self.smtp_server, self.smtp_port, self.sender_email, self.connect,
+                                  max_conns=self.max_connections)
+        return SMTPSession(pool)
+    
+    def send_message_over(self, session, recipient):
+        """Send the recipient's personalized message over an open session"""
+        logger.debug("Preparing email for: %s", recipient)
+        try:
+            self.send_email(session, [recipient], self._serialize_message(recipient))
         except Exception as e:
-            logging.error(f"Failed to send email to {recipient}: {str(e)}")
+            logger.error("❌ Failed to send to: %s: %s", recipient, e)
             return False
+        logger.debug("✅ Successfully sent to: %s", recipient)
+        return True
+    
+    def _send_common_email(self):
+        """Send one message to every recipient in a single SMTP transaction"""
+        # A lone recipient (e.g. the test send) can be addressed directly
+        # without disclosing anyone else
+        to_header = self.recipients[0] if len(self.recipients) == 1 else "undisclosed-recipients:;"
+        data = self._serialize_message(to_header)
+        try:
+            with self.open_session() as session:
+                refused = self.send_email(session, self.recipients, data)
+        except smtplib.SMTPRecipientsRefused as e:
+            refused = e.recipients
+        except Exception as e:
+            logger.error("Failed to send email to %s: %s", self.recipients, e)
+            return 0
+        
+        for recipient in self.recipients:
+            if recipient in refused:
+                logger.error("❌ Failed to send to: %s (%s)", recipient, refused[recipient])
+            else:
+                logger.debug("✅ Successfully sent to: %s", recipient)
+        return len(self.recipients) - len(refused)
+    
+    def _send_one(self, recipient):
+        """Send one personalized message over a connection borrowed from the pool"""
+        if self._abort.is_set():
+            return False
+        try:
+            session = self.open_session()
+        except Exception as e:
+            logger.error("Failed to connect to SMTP server for %s: %s", recipient, e)
+            self._record_failures(1)
+            return False
+        
+        with session:
+            sent = self.send_message_over(session, recipient)
+        if not sent:
+            self._record_failures(1)
+        return sent
+    
+    def _record_failures(self, count):
+        """Count failed sends and abort the batch once a third of it has failed"""
+        total_recipients = len(self.recipients)
+        with self._failure_lock:
+            self._failure_count += count
+            # Failures this early usually mean revoked credentials or a dead
+            # network, so the remaining sends would fail too
+            if (total_recipients >= 3 and self._failure_count * 3 >= total_recipients
+                    and not self._abort.is_set()):
+                logger.error("%d/%d sends failed, aborting batch", self._failure_count, total_recipients)
+                self._abort.set()
+    
+    def _reset_failures(self):
+        self._failure_count = 0
+        self._abort.clear()
+    
+    def _recipient_shares(self):
+        """Split the recipients into one share per concurrent SMTP connection"""
+        workers = min(len(self.recipients), self.max_connections)
+        return [self.recipients[i::workers] for i in range(workers)]
+    
+    def _send_individual_emails_parallel(self):
+        """Send every personalized message concurrently over pooled connections
+        
+        SMTP connections are stateful and not thread-safe, so each send
+        borrows its own connection; the pool caps how many are open.
+        """
+        self._reset_failures()
+        workers = min(len(self.recipients), self.max_connections)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._send_one, recipient): recipient for recipient in self.recipients}
+            return sum(future.result() for future in futures)
+    
+    async def _send_share_async(self, recipients):
+        """Send a separately addressed message to each recipient over one aiosmtplib connection"""
+        implicit_tls = self.smtp_port == smtplib.SMTP_SSL_PORT
+        client = aiosmtplib.SMTP(
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            username=self.sender_email,
+            password=self.sender_password,
+            use_tls=implicit_tls,
+            start_tls=not implicit_tls,
+            tls_context=_SSL_CONTEXT,
+            timeout=_SMTP_TIMEOUT
+        )
+        try:
+            await client.connect()
+        except Exception as e:
+            logger.error("Failed to connect to SMTP server for %s: %s", recipients, e)
+            self._record_failures(len(recipients))
+            return 0
+        
+        success_count = 0
+        try:
+            for recipient in recipients:
+                if self._abort.is_set():
+                    break
+                logger.debug("Preparing email for: %s", recipient)
+                data = self._serialize_message(recipient)
+                try:
+                    await client.sendmail(self.sender_email, [recipient], data)
+                    success_count += 1
+                    logger.debug("✅ Successfully sent to: %s", recipient)
+                except Exception as e:
+                    logger.error("❌ Failed to send to: %s: %s", recipient, e)
+                    self._record_failures(1)
+        finally:
+            # Nothing else is sent on this connection, so skip the QUIT round trip
+            client.close()
+        return success_count
+    
+    def _send_individual_emails_async(self):
+        """Run the individual sends as concurrent aiosmtplib connections on one thread"""
+        async def send_all(shares):
+            results = await asyncio.gather(*[self._send_share_async(share) for share in shares])
+            return sum(results)
+        
+        self._reset_failures()
+        return asyncio.run(send_all(self._recipient_shares()))
     
     def send_monthly_emails(self):
         """Send emails to all recipients"""
         current_date = datetime.now()
         
-        logging.info(f"Starting monthly email send for {current_date.strftime('%B %Y')}")
-        logging.info(f"Today is the {current_date.day}th of the month")
+        logger.info("Starting monthly email send for %s", current_date.strftime('%B %Y'))
+        logger.info("Today is the %dth of the month", current_date.day)
         
         # Check if email credentials are available
         if not self.sender_email or not self.sender_password:
-            logging.error("Email credentials not found in environment variables")
+            logger.error("Email credentials not found in environment variables")
             return False
         
-        success_count = 0
         total_recipients = len(self.recipients)
         
-        logging.info(f"Recipients to send to: {self.recipients}")
+        logger.info("Recipients to send to: %s", self.recipients)
         
-        for recipient in self.recipients:
-            logging.info(f"Preparing email for: {recipient}")
-            message = self.create_email_message(recipient)
-            if self.send_email(recipient, message):
-                success_count += 1
-                logging.info(f"✅ Successfully sent to: {recipient}")
-            else:
-                logging.error(f"❌ Failed to send to: {recipient}")
+        # Nothing to send, so don't connect or render anything
+        if not self.recipients:
+            logger.info("No recipients, nothing to send")
+            return True
+        
+        if self.dry_run:
+            logger.info("Dry run: would send to %s", self.recipients)
+            return True
+        
+        # Fail fast on a bad SMTP_SERVER before rendering anything; the
+        # resolved addresses are cached and reused by connect()
+        try:
+            self._resolve_smtp_server()
+        except OSError as e:
+            logger.error("Could not resolve SMTP server %s: %s", self.smtp_server, e)
+            return False
+        
+        try:
+            self._prepare_batch()
+        except OSError as e:
+            logger.error("Could not read breakdown file %s: %s", self.breakdown_file, e)
+            return False
+        
+        if self.personalized and self.use_async:
+            success_count = self._send_individual_emails_async()
+        elif self.personalized:
+            success_count = self._send_individual_emails_parallel()
+        else:
+            success_count = self._send_common_email()
         
-        logging.info(f"Email send complete. Successfully sent to {success_count}/{total_recipients} recipients")
+        logger.info("Email send complete. Successfully sent to %d/%d recipients", success_count, total_recipients)
         return success_count == total_recipients
 
 def main():
     """Main function to run the email sender"""
+    configure_logging()
     sender = GitHubEmailSender()
     
     success = sender.send_monthly_emails()
     
     if not success:
-        exit(1)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Process-wide pool of authenticated SMTP connections
+Connections are keyed by (host, port, user) and reused across senders and threads
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class Pool:
+    """Authenticated SMTP connections that are reused instead of reopened
+
+    connect is a callable returning a logged-in smtplib.SMTP. At most
+    max_conns connections are open at once; acquire() waits up to
+    wait_timeout seconds for one to be released. Idle connections are
+    closed after idle_timeout seconds. A connection released within the
+    last check_after seconds is reused without a NOOP round trip.
+    """
+
+    def __init__(self, connect, max_conns=4, idle_timeout=100, wait_timeout=30, check_after=5):
+        self.connect = connect
+        self.max_conns = max_conns
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.check_after = check_after
+
+        self._idle = []  # (server, released_at), most recently released last
+        self._open = 0
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._reaper = threading.Thread(target=self._reap_idle, name="smtp-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def acquire(self):
+        """Return a live connection, reusing an idle one when possible"""
+        while True:
+            server = self._take_idle_or_reserve()
+            if server is None:
+                # A slot was reserved for a new connection
+                try:
+                    return self.connect()
+                except Exception:
+                    self._free_slot()
+                    raise
+            server, released_at = server
+            if time.monotonic() - released_at < self.check_after or self._is_alive(server):
+                return server
+            self._retire(server)
+
+    def release(self, server):
+        """Hand a connection back for reuse"""
+        with self._cond:
+            self._idle.append((server, time.monotonic()))
+            self._cond.notify()
+
+    def discard(self, server):
+        """Close a connection that should not be reused"""
+        self._retire(server)
+
+    def close_all(self, graceful=True):
+        """Close every idle connection and stop the reaper
+
+        graceful sends QUIT and waits for the reply before closing each
+        connection; otherwise the sockets are just closed.
+        """
+        self._closed.set()
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._retire(server, graceful)
+
+    def _take_idle_or_reserve(self):
+        """Pop an idle (server, released_at), or reserve a slot for a new connection and return None"""
+        self._reap_idle_once()
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._open < self.max_conns:
+                    self._open += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No SMTP connection available after {self.wait_timeout}s")
+                self._cond.wait(remaining)
+
+    def _is_alive(self, server):
+        """NOOP health check before reusing an idle connection"""
+        try:
+            return server.noop()[0] == 250
+        except OSError:  # Includes SMTPServerDisconnected and socket timeouts
+            return False
+
+    def _retire(self, server, graceful=False):
+        """Close a connection and free its slot
+
+        Connections retired while the pool is in use are dead, unhealthy or
+        idle, so they are closed without the QUIT round trip.
+        """
+        if graceful:
+            try:
+                server.quit()
+            except OSError:  # Includes SMTPException
+                server.close()
+        else:
+            server.close()
+        self._free_slot()
+
+    def _free_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _reap_idle_once(self):
+        """Close connections that have been idle for idle_timeout seconds"""
+        now = time.monotonic()
+        with self._cond:
+            expired = [(s, t) for s, t in self._idle if now - t >= self.idle_timeout]
+            self._idle = [(s, t) for s, t in self._idle if now - t < self.idle_timeout]
+        for server, _ in expired:
+            logger.debug("Closing idle SMTP connection")
+            self._retire(server)
+
+    def _reap_idle(self):
+        while not self._closed.wait(self.idle_timeout / 2):
+            self._reap_idle_once()
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(host, port, user, connect, **options):
+    """Return the process-wide pool for (host, port, user), creating it on first use"""
+    key = (host, port, user)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = Pool(connect, **options)
+        return pool
+
+def close_all_pools(graceful=True):
+    """Close every pooled connection"""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close_all(graceful)
+
+# The process is exiting, so skip waiting for each server's QUIT reply
+atexit.register(close_all_pools, graceful=False)
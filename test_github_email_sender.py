@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Unit tests for github_email_sender and smtp_pool (run with python -m unittest)
+"""
+
+import os
+import smtplib
+import socket
+import unittest
+from unittest import mock
+
+import github_email_sender
+import smtp_pool
+
+
+class FakeServer:
+    """Stands in for a logged-in smtplib.SMTP"""
+
+    def __init__(self, sendmail_error=None):
+        self.sock = object()
+        self.sendmail_error = sendmail_error
+        self.sent = []
+
+    def has_extn(self, name):
+        return False
+
+    def sendmail(self, from_addr, to_addrs, data):
+        if self.sendmail_error is not None:
+            self.sock = None
+            raise self.sendmail_error
+        self.sent.append((from_addr, to_addrs, data))
+        return {}
+
+    def noop(self):
+        return (250, b"OK")
+
+    def quit(self):
+        self.close()
+
+    def close(self):
+        self.sock = None
+
+
+class SMTPSessionTest(unittest.TestCase):
+
+    def make_pool(self, connect):
+        pool = smtp_pool.Pool(connect, max_conns=2)
+        self.addCleanup(pool.close_all, graceful=False)
+        return pool
+
+    def test_reconnects_once_after_disconnect(self):
+        servers = [FakeServer(smtplib.SMTPServerDisconnected()), FakeServer()]
+        pool = self.make_pool(lambda: servers.pop(0))
+
+        with self.assertLogs("github_email_sender", "WARNING"):
+            with github_email_sender.SMTPSession(pool) as session:
+                session.send(b"data", "me@example.com", ["you@example.com"])
+
+        self.assertEqual(pool._open, 1)
+        self.assertEqual(len(pool._idle), 1)
+        self.assertEqual(pool._idle[0][0].sent, [("me@example.com", ["you@example.com"], b"data")])
+
+    def test_failed_reconnect_frees_the_slot_once(self):
+        def connect():
+            if not attempts:
+                attempts.append(1)
+                return FakeServer(smtplib.SMTPServerDisconnected())
+            raise OSError("connection refused")
+        attempts = []
+        pool = self.make_pool(connect)
+
+        with self.assertRaises(OSError), self.assertLogs("github_email_sender", "WARNING"):
+            with github_email_sender.SMTPSession(pool) as session:
+                session.send(b"data", "me@example.com", ["you@example.com"])
+
+        self.assertEqual(pool._open, 0)
+        self.assertEqual(pool._idle, [])
+
+
+class GitHubEmailSenderTest(unittest.TestCase):
+
+    def make_sender(self, **env):
+        """Build a sender from the given environment instead of the real one"""
+        env.setdefault("SENDER_EMAIL", "me@example.com")
+        env.setdefault("SENDER_PASSWORD", "app-password")
+        patcher = mock.patch.dict(os.environ, env, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        github_email_sender._load_config.cache_clear()
+        self.addCleanup(github_email_sender._load_config.cache_clear)
+        return github_email_sender.GitHubEmailSender()
+
+    def test_flags_accept_true_and_1(self):
+        names = ("PERSONALIZED_EMAILS", "SMTP_ASYNC", "DRY_RUN", "SMTP_DEBUG")
+        for value, expected in (("true", True), ("1", True), ("TRUE", True), ("false", False), ("", False)):
+            with self.subTest(value=value):
+                self.make_sender(**dict.fromkeys(names, value))
+                config = github_email_sender._load_config()
+                self.assertEqual((config.personalized, config.use_async, config.dry_run, config.smtp_debug),
+                                 (expected,) * 4)
+
+    def test_dry_run_makes_no_smtp_calls(self):
+        sender = self.make_sender(DRY_RUN="1")
+
+        with mock.patch.object(smtp_pool, "get_pool") as get_pool, \
+                mock.patch("smtplib.SMTP") as smtp, \
+                mock.patch("smtplib.SMTP_SSL") as smtp_ssl, \
+                mock.patch("socket.getaddrinfo") as getaddrinfo, \
+                self.assertLogs("github_email_sender", "INFO"):
+            self.assertTrue(sender.send_monthly_emails())
+        get_pool.assert_not_called()
+        smtp.assert_not_called()
+        smtp_ssl.assert_not_called()
+        getaddrinfo.assert_not_called()
+
+    def test_connect_falls_back_to_the_next_address(self):
+        sender = self.make_sender()
+        addrinfo = [
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("2001:db8::1", 465, 0, 0)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.1", 465)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.1", 465)),
+        ]
+
+        with mock.patch("socket.getaddrinfo", return_value=addrinfo), \
+                mock.patch("smtplib.SMTP_SSL") as smtp_ssl:
+            server = smtp_ssl.return_value
+            server.connect.side_effect = [OSError("Network is unreachable"), (220, b"ready")]
+            self.assertIs(sender.connect(), server)
+
+        self.assertEqual(server.connect.call_args_list,
+                         [mock.call("2001:db8::1", 465), mock.call("192.0.2.1", 465)])
+        self.assertEqual(server._host, "smtp.gmail.com")
+        self.assertEqual(smtp_ssl.call_args.kwargs["timeout"], github_email_sender._SMTP_TIMEOUT)
+        server.login.assert_called_once_with("me@example.com", "app-password")
+
+    def test_messages_build_without_sender_email(self):
+        sender = self.make_sender(SENDER_EMAIL="")
+
+        message = sender.create_email_message("you@example.com")
+
+        self.assertEqual(message["To"], "you@example.com")
+        self.assertIsNone(message["From"])
+        self.assertIsNone(message["Reply-To"])
+        self.assertIsNotNone(sender.build_common_message()["Subject"])
+
+    def test_no_recipients_sends_nothing(self):
+        for personalized in ("false", "true"):
+            with self.subTest(personalized=personalized):
+                self.make_sender(PERSONALIZED_EMAILS=personalized)
+                sender = github_email_sender.GitHubEmailSender(recipients=[])
+
+                with mock.patch.object(smtp_pool, "get_pool") as get_pool, \
+                        mock.patch("socket.getaddrinfo") as getaddrinfo, \
+                        self.assertLogs("github_email_sender", "INFO"):
+                    self.assertTrue(sender.send_monthly_emails())
+                get_pool.assert_not_called()
+                getaddrinfo.assert_not_called()
+
+    def test_unreadable_breakdown_file_fails_the_run(self):
+        sender = self.make_sender(BREAKDOWN_FILE=os.path.join(os.path.dirname(__file__), "missing.txt"))
+
+        with mock.patch.object(sender, "_resolve_smtp_server"), \
+                mock.patch.object(smtp_pool, "get_pool") as get_pool, \
+                self.assertLogs("github_email_sender", "ERROR"):
+            self.assertFalse(sender.send_monthly_emails())
+        get_pool.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()